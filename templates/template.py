@@ -10,13 +10,11 @@ __DESCRIPTION__=("This is a template for Python scripts.")
 # - v0.0.1, yyyy-mm-dd, David Wettstein: First implementation.
 
 
-import argparse
-import configparser
-import getpass
+import functools
 import os
-import re
 import sys
-from string import Template
+# Further stdlib modules are imported within the functions using them
+# to keep the startup time low (e.g. for `--help`).
 
 
 FILE_PATH = os.path.realpath(__file__)
@@ -25,8 +23,12 @@ FILE_DIR = os.path.dirname(FILE_PATH)
 
 # pylint: disable=import-error,wrong-import-position
 
+# An empty answer confirms as well, as Y is the default.
+CONFIRM_ANSWERS = frozenset(("", "y", "Y", "yes", "Yes"))
+
 
 def process_arguments():
+    import argparse
     _argparser = argparse.ArgumentParser(
         description=(__DESCRIPTION__),
         epilog=(
@@ -65,6 +67,7 @@ def process_arguments():
 
 
 def get_credentials(args=None):
+    import getpass
     if args and args.user:
         _user = args.user
     else:
@@ -79,16 +82,70 @@ def get_credentials(args=None):
     return (_user, _pswd)
 
 
+class Config(object):
+    """
+    A lightweight, read-only replacement for `configparser.ConfigParser`.
+
+    Sections are dicts of options with lowercased names, e.g.
+    `config["API"]["port"]`, whereas `config.get("API", "Port")` is
+    case-insensitive like with configparser. Unlike configparser, the
+    parser rejects indented continuation lines (multi-line values) and
+    treats `[DEFAULT]` like any other section, i.e. its options aren't
+    inherited by other sections. There is no interpolation either.
+    """
+
+    def __init__(self, sections):
+        self._sections = sections
+
+    def __getitem__(self, section):
+        return self._sections[section]
+
+    def __contains__(self, section):
+        return section in self._sections
+
+    def sections(self):
+        return list(self._sections)
+
+    def get(self, section, option):
+        return self._sections[section][option.lower()]
+
+
+@functools.lru_cache(maxsize=32)
+def _parse_ini(path, mtime_ns):
+    # The mtime is part of the cache key only, so that a changed file is
+    # parsed again. Option names are lowercased like configparser does.
+    _sections = {}
+    _options = None
+    with open(path, "r", encoding="utf-8") as opened_file:
+        for _line in opened_file.read().split("\n"):
+            _line = _line.strip()
+            if not _line or _line[0] in "#;":
+                continue
+            if _line[0] == "[" and _line[-1] == "]":
+                _options = _sections.setdefault(_line[1:-1].strip(), {})
+                continue
+            if _options is None:
+                raise ValueError("Option outside of a section in %s: %s"
+                                 % (path, _line))
+            _sep = min((i for i in (_line.find("="), _line.find(":"))
+                        if i != -1), default=-1)
+            if _sep == -1:
+                raise ValueError("Invalid line in %s: %s" % (path, _line))
+            _key = _line[:_sep].strip().lower()
+            _options[_key] = _line[_sep + 1:].strip()
+    return _sections
+
+
 def load_config(path):
-    _config = configparser.ConfigParser()
-    _config.read(path)
-    return _config
+    _sections = _parse_ini(path, os.stat(path).st_mtime_ns)
+    # Copy the cached sections, so that callers can't alter the cache.
+    return Config({s: dict(o) for (s, o) in _sections.items()})
 
 
 def confirm():
     if not NO_CONFIRM:
         _confirm = input("Do you want to continue? [Y/n] ")
-        if not re.search("^([yY]{1}(es)?)?$", _confirm):
+        if _confirm.strip() not in CONFIRM_ANSWERS:
             print("Abort.")
             sys.exit()
 
@@ -113,25 +170,24 @@ def function(param, another_param):
 def main():
     args = process_arguments()
 
+    # Load the config before prompting, so that an invalid config is
+    # reported before the user typed the credentials.
     config = load_config(os.path.join(FILE_DIR, "template.ini"))
-    base_url_draft = "%s://%s:%s" % (
-        config.get("API", "protocol"),
-        config.get("API", "fqdn"),
-        config.get("API", "port"))
-    base_url_template = Template(base_url_draft)
-    base_url = base_url_template.substitute(subdomain=args.instance)
-    print("URL: %s" % base_url)
-
     (user, pswd) = get_credentials(args)
 
+    api_config = config["API"]
+    base_url = "%s://%s:%s" % (
+        api_config["protocol"],
+        api_config["fqdn"].format(subdomain=args.instance),
+        api_config["port"])
+    print("URL: %s" % base_url)
+
     confirm()
 
-    try:
-        print(args.accumulate(args.numbers))
-    except Exception as ex:
-        # ex_type, ex_value, ex_traceback = sys.exc_info()
-        print(repr(ex))
-        raise
+    accumulate = args.accumulate
+    numbers = args.numbers
+    # Exceptions are not caught here, the interpreter prints the traceback.
+    print(accumulate(numbers))
 
 
 # Program entry point. Don't execute if imported.
@@ -10,7 +10,8 @@ __DESCRIPTION__=("This is a template for Python API clients.")
 # - v0.0.1, yyyy-mm-dd, David Wettstein: First implementation.
 
 
-from enum import Enum
+from collections import OrderedDict
+import copy
 import os
 import sys
 
@@ -24,10 +25,11 @@ from utils.webrequest import WebRequester
 from utils.webrequest import UnauthorizedException
 
 
-class Endpoints(Enum):
-    AUTHENTICATION = "/api/api-token-auth/"
-    AUTHENTICATION_REFRESH = "/api/api-token-refresh/"
-    RESOURCE = "/api/resource/"
+__all__ = ["AUTH_URL", "AUTH_REFRESH_URL", "RESOURCE_URL", "Client"]
+
+AUTH_URL = "/api/api-token-auth/"
+AUTH_REFRESH_URL = "/api/api-token-refresh/"
+RESOURCE_URL = "/api/resource/"
 
 
 class Client(object):
@@ -40,11 +42,26 @@ class Client(object):
         password: str: The password used for authentication.
         verify_ssl_certs: bool: If true, validate server certificates.
             Set to false to allow self-signed certificates.
+        cache_size: int: The max. number of cached `get_resource` results,
+            default is 0 (caching disabled). Cached results are returned
+            until `invalidate` is called, so enable it only for resources
+            that rarely change.
 
     Returns:
         The API client for the given URL.
     """
 
+    __slots__ = (
+        "_base_url",
+        "_username",
+        "_password",
+        "_token",
+        "_log_print",
+        "_cache_size",
+        "_get_cache",
+        "_webrequester",
+    )
+
     def __init__(self,
                  base_url: str,
                  username: str,
@@ -56,12 +73,15 @@ class Client(object):
                  log_print: bool = False,
                  log_requests: bool = False,
                  log_headers: bool = False,
-                 log_bodies: bool = False):
+                 log_bodies: bool = False,
+                 cache_size: int = 0):
         self._base_url = base_url
         self._username = username
         self._password = password
         self._token = None
         self._log_print = log_print
+        self._cache_size = cache_size
+        self._get_cache = OrderedDict()
         self._webrequester = WebRequester(self._base_url,
                                           use_session=use_session,
                                           verify_ssl_certs=verify_ssl_certs,
@@ -78,26 +98,26 @@ class Client(object):
         })
 
     def _get_token(self) -> str:
-        return self.__get_or_refresh_token(Endpoints.AUTHENTICATION)
+        return self.__get_or_refresh_token(AUTH_URL)
 
     def _refresh_token(self) -> str:
-        return self.__get_or_refresh_token(Endpoints.AUTHENTICATION_REFRESH)
+        return self.__get_or_refresh_token(AUTH_REFRESH_URL)
 
-    def __get_or_refresh_token(self, endpoint: Endpoints):
-        if endpoint.value == Endpoints.AUTHENTICATION.value:
+    def __get_or_refresh_token(self, endpoint: str):
+        if endpoint == AUTH_URL:
             json_body = {
                 "username": self._username,
                 "password": self._password,
             }
-        elif endpoint.value == Endpoints.AUTHENTICATION_REFRESH.value:
+        elif endpoint == AUTH_REFRESH_URL:
             json_body = {
                 "token": self._token,
             }
         else:
-            raise Exception("Unknown token endpoint: %s" % (endpoint.value))
+            raise Exception("Unknown token endpoint: %s" % (endpoint))
         _output = self._webrequester.invoke_and_handle(
             "POST",
-            endpoint.value,
+            endpoint,
             json=json_body)
         if "token" not in _output:
             raise Exception("Failed to get or refresh token: %s\n" % (_output))
@@ -108,6 +128,28 @@ class Client(object):
                                              token=("Bearer " + self._token))
         return self._token
 
+    def invalidate(self):
+        """
+        Clear all cached `get_resource` results, e.g. after a resource was
+        changed.
+        """
+        self._get_cache.clear()
+
+    def _get_cache_key(self, resource, params: dict):
+        # Return None, if the request must not be cached.
+        if self._cache_size <= 0:
+            return None
+        if params is None:
+            return (str(resource), None)
+        if not isinstance(params, dict):
+            return None  # Don't cache requests with e.g. a query string.
+        try:
+            _key = (str(resource), tuple(sorted(params.items())))
+            hash(_key)
+        except TypeError:
+            return None  # Don't cache unsortable or unhashable params.
+        return _key
+
     def get_resource(self,
                      resource="",
                      params: dict = None,
@@ -115,6 +157,9 @@ class Client(object):
         """
         Get all or a specific resource.
 
+        If `cache_size` is greater than 0, results are cached per resource
+        and params, see also `invalidate`.
+
         Args:
             resource: int/str: An optional resource id or URL suffix to
                 request.
@@ -125,13 +170,28 @@ class Client(object):
             The existing resources as a list (default) or as a
             dict.
         """
+        _cache_key = self._get_cache_key(resource, params)
+        if _cache_key is not None and _cache_key in self._get_cache:
+            self._get_cache.move_to_end(_cache_key)
+            _output = copy.deepcopy(self._get_cache[_cache_key])
+        else:
+            _output = self.__request_resource(resource, params)
+            if _cache_key is not None:
+                self._get_cache[_cache_key] = copy.deepcopy(_output)
+                if len(self._get_cache) > self._cache_size:
+                    self._get_cache.popitem(last=False)
+        if as_dict:
+            _output = {(_item["key"] if "key" in _item else _item["name"]):
+                       _item for _item in _output}
+        return _output
+
+    def __request_resource(self, resource, params: dict):
         if not self._token:
             self._token = self._get_token()
-        _output = None
         try:
-            _output = self._webrequester.invoke_and_handle(
+            return self._webrequester.invoke_and_handle(
                 "GET",
-                Endpoints.RESOURCE.value + str(resource),
+                RESOURCE_URL + str(resource),
                 params=params)
         except Exception as ex:
             if self._log_print:
@@ -141,7 +201,3 @@ class Client(object):
             if isinstance(ex, UnauthorizedException):
                 self._token = None  # Likely, the token has expired.
             raise
-        if as_dict:
-            _output = {(_item["key"] if "key" in _item else _item["name"]):
-                       _item for _item in _output}
-        return _output
@@ -0,0 +1,254 @@
+#!/usr/bin/env python
+__FILENAME__="async_webrequest.py"
+__AUTHOR__="David Wettstein"
+__VERSION__="1.0.0"
+__COPYRIGHT__="Copyright (c) 2018-2021 %s" % (__AUTHOR__)
+__LICENSE__="MIT License (https://dwettstein.mit-license.org/)"
+__LINK__="https://github.com/dwettstein/PythonStuff"
+__DESCRIPTION__=(
+    "A module providing an asynchronous variant of the WebRequester class "
+    "for many concurrent web requests."
+)
+# Changelog:
+# - v1.0.0, 2026-10-15, David Wettstein: Initial module.
+
+
+import asyncio
+from typing import Union
+
+import httpx
+
+from .webrequest import _decode_json
+from .webrequest import _split_base_url
+from .webrequest import DEFAULT_TIMEOUT
+from .webrequest import Logger
+from .webrequest import status_code_to_exception
+
+
+class AsyncWebRequester(object):
+    """
+    An asynchronous variant of `webrequest.WebRequester` using the httpx
+    package (https://www.python-httpx.org).
+
+    All requests share a single connection pool and with HTTP/2 even a
+    single connection per host, so many requests can be awaited
+    concurrently within one thread (see also `gather_invoke`).
+
+    Args:
+        base_url: str: The base URL of the web API.
+        verify_ssl_certs: bool: If true, validate server certificates.
+            Set to false to allow self-signed certificates.
+        http2: bool: If true, HTTP/2 is used if the server supports it,
+            default is false (requires the h2 package, e.g.
+            `pip install httpx[http2]`).
+        max_connections: int: The max. number of concurrent connections,
+            default is 100.
+        log_file: str: If file logging is needed, set a log file here.
+        log_print: bool: If true, logging with print statements is enabled.
+        log_requests: bool: If true, all requests will be logged.
+        log_headers: bool: If true, all headers will be logged (pay attention
+            with passwords).
+        log_bodies: bool: If true, all bodies will be logged.
+        log_body_limit: int: If set, logged response bodies are truncated to
+            this number of bytes, default is None (no limit).
+
+    Returns:
+        The AsyncWebRequester instance for the given URL.
+    """
+
+    def __init__(self,
+                 base_url: str,
+                 verify_ssl_certs: bool = True,
+                 http2: bool = False,
+                 max_connections: int = 100,
+                 log_file: str = None,
+                 log_print: bool = False,
+                 log_requests: bool = False,
+                 log_headers: bool = False,
+                 log_bodies: bool = False,
+                 log_body_limit: int = None):
+        (self._base_url, self._fqdn) = _split_base_url(base_url)
+        self._base_url_slash = self._base_url + "/"
+        self._client = httpx.AsyncClient(
+            verify=verify_ssl_certs,
+            http2=http2,
+            limits=httpx.Limits(max_connections=max_connections))
+
+        self._logger = Logger(log_file=log_file,
+                              log_print=log_print,
+                              log_requests=log_requests,
+                              log_headers=log_headers,
+                              log_bodies=log_bodies,
+                              log_body_limit=log_body_limit)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    def set_default_headers(self,
+                            headers: dict):
+        """
+        Set the default headers to use with every request
+        (previously set headers will be replaced).
+
+        Args:
+            headers: dict: All headers to set as a dict.
+        """
+        self._client.headers = headers
+
+    def set_authorization(self,
+                          auth_type: str,
+                          username: str = None,
+                          password: str = None,
+                          token: str = None,
+                          token_header: str = "Authorization"):
+        """
+        Set the authorization to use with every request.
+
+        Args:
+            auth_type: str: The kind of authorization to use
+                (one of `Basic`, `Digest` or `Token`).
+            username: str: The username for Basic or Digest authorization.
+            password: str: The password for Basic or Digest authorization.
+            token: str: The token for Token authorization.
+            token_header: str: The header name used for Token authorization
+                (default is `Authorization`).
+        """
+        if auth_type.lower() == "basic":
+            self._client.auth = httpx.BasicAuth(username, password)
+        elif auth_type.lower() == "digest":
+            self._client.auth = httpx.DigestAuth(username, password)
+        elif auth_type.lower() == "token":
+            self._client.headers[token_header] = token
+
+    async def aclose(self):
+        """Close the client and its connections."""
+        await self._client.aclose()
+
+    async def invoke(self,
+                     method: str,
+                     endpoint: str,
+                     headers: dict = None,
+                     params: dict = None,
+                     data: Union[str, bytes] = None,
+                     json=None,
+                     timeout=DEFAULT_TIMEOUT) -> httpx.Response:
+        """
+        Invoke an endpoint of the web API with given HTTP method.
+
+        Args:
+            method: str: The HTTP method for the request.
+            endpoint: str: The endpoint to request.
+            headers: dict: A dict of additional headers for this request
+                (e.g. `{"Accept": "application/json"}`), default is `None`.
+            params: dict: A dict of URL query string data
+                (e.g. `{"key": "value"}`), default is `None`.
+            data: str/bytes: The request body as string or bytes, use either
+                data or json, default is `None`. Pass already encoded bytes
+                (e.g. a cached body) to avoid encoding it on every request.
+            json: object: The request body as object, use either data or json,
+                default is `None`.
+            timeout: float/tuple: The timeout in seconds, either as a float or
+                as a tuple `(connect timeout, read timeout)`, default is
+                `DEFAULT_TIMEOUT`. Use `None` to wait forever.
+
+        Returns:
+            The response of the request as `httpx.Response` object.
+
+        Raises:
+            httpx.HTTPError:
+                An ambiguous exception raised by httpx package.
+        """
+        url = self._base_url_slash + endpoint.lstrip("/")
+
+        if self._logger.logs_headers:
+            log_headers = {**self._client.headers, **(headers or {})}
+        else:
+            log_headers = None
+        self._logger.log_request(url=url,
+                                 method=method,
+                                 headers=log_headers,
+                                 body=(data if data else json))
+
+        if isinstance(timeout, tuple):
+            timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+        response = await self._client.request(
+            method=method,
+            url=url,
+            headers=headers,
+            params=params,
+            content=data,
+            json=json,
+            timeout=timeout)
+
+        self._logger.log_response(response=response)
+
+        return response
+
+    async def invoke_and_handle(self,
+                                method: str,
+                                endpoint: str,
+                                headers: dict = None,
+                                params: dict = None,
+                                data: Union[str, bytes] = None,
+                                json=None,
+                                decode_response: bool = True,
+                                as_tuple: bool = False,
+                                timeout=DEFAULT_TIMEOUT):
+        """
+        Invoke an endpoint of the web API with given HTTP method and handle
+        the response.
+
+        See `webrequest.WebRequester.invoke_and_handle` for the args and
+        return values.
+
+        Raises:
+            httpx.HTTPError:
+                An ambiguous exception raised by httpx package.
+            webrequest.WebRequestResponseException:
+                An ambiguous exception depending on the response status code.
+        """
+        response = await self.invoke(method=method,
+                                     endpoint=endpoint,
+                                     headers=headers,
+                                     params=params,
+                                     data=data,
+                                     json=json,
+                                     timeout=timeout)
+        # Same as `requests.Response.ok`.
+        if response.status_code < 400:
+            response_data = ""
+            if response.status_code != 204:
+                if decode_response:
+                    try:
+                        response_data = _decode_json(response)
+                    except Exception:
+                        response_data = response.text
+                else:
+                    response_data = response.content
+            if as_tuple:
+                return response.status_code, response.headers, response_data
+            return response_data
+        else:
+            status_code_to_exception(response.status_code, response=response)
+
+    async def gather_invoke(self, requests: list) -> list:
+        """
+        Invoke multiple requests concurrently.
+
+        Args:
+            requests: list: A list of dicts, each containing the args for
+                `invoke` (e.g. `{"method": "GET", "endpoint": "/api/"}`).
+
+        Returns:
+            A list with the `httpx.Response` of each request, in the same
+            order as the given requests.
+
+        Raises:
+            httpx.HTTPError:
+                An ambiguous exception raised by httpx package.
+        """
+        return await asyncio.gather(
+            *(self.invoke(**request) for request in requests))
@@ -14,6 +14,7 @@ __DESCRIPTION__=(
 # - v1.0.0, 2018-11-26, David Wettstein: Initial module.
 
 
+import locale
 import subprocess
 
 
@@ -36,18 +37,22 @@ def execute(process_args: list) -> tuple:
         ValueError: The function was called with invalid arguments.
         subprocess.SubprocessError: Another error occurred.
     """
-    _process = subprocess.Popen(
+    _process = subprocess.run(
         process_args,
-        stdin=subprocess.PIPE,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        universal_newlines=True,
+        input=b"",
+        capture_output=True,
+        check=False,
     )
-    _out, _err = _process.communicate()
-
-    if not _out:
-        _out = ""
-    if not _err:
-        _err = ""
+    _out = _decode_output(_process.stdout)
+    _err = _decode_output(_process.stderr)
     _ret = _process.returncode
     return (_out, _err, _ret)
+
+
+def _decode_output(data: bytes) -> str:
+    # Decode once at the end and normalize line endings as the former
+    # universal newlines mode did.
+    if not data:
+        return ""
+    _data = data.decode(locale.getpreferredencoding(False))
+    return _data.replace("\r\n", "\n").replace("\r", "\n")
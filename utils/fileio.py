@@ -1,7 +1,7 @@
 #!/usr/bin/env python
 __FILENAME__="fileio.py"
 __AUTHOR__="David Wettstein"
-__VERSION__="1.0.2"
+__VERSION__="1.1.0"
 __COPYRIGHT__="Copyright (c) 2018-2021 %s" % (__AUTHOR__)
 __LICENSE__="MIT License (https://dwettstein.mit-license.org/)"
 __LINK__="https://github.com/dwettstein/PythonStuff"
@@ -9,6 +9,7 @@ __DESCRIPTION__=(
     "This module contains utility functions for file IO handling."
 )
 # Changelog:
+# - v1.1.0, 2026-10-15, David Wettstein: Write atomically, add iter_csv.
 # - v1.0.2, 2021-12-19, David Wettstein: Refactor header part.
 # - v1.0.1, 2020-11-29, David Wettstein: Improve linting.
 # - v1.0.0, 2018-11-26, David Wettstein: Initial module.
@@ -16,35 +17,87 @@ __DESCRIPTION__=(
 
 import base64
 import csv
+import os
+import stat
+import uuid
 
 
 LOG = True
 DEBUG = False
 
 
-def write_file(filename: str, content: str) -> str:
+def write_file(filename: str, content: str) -> bool:
     """
     Write content to a given file.
 
+    The content is written UTF-8 encoded and without newline translation
+    (i.e. also with `\n` line endings on Windows). It's written to a new
+    file in the same directory first, which then atomically replaces the
+    given file (or the file a symlink points to). Thus, write access to the
+    directory is required and the file gets a new inode (e.g. hard links
+    keep the old content), but the mode of an existing file is kept.
+
     Args:
         filename: The path to the file you want to write.
+        content: The content to write, trailing newlines are removed.
 
     Returns:
-        The file content as a string.
+        True if the file was written.
 
     Raises:
-        ValueError
+        OSError: The file could not be written (nothing is printed).
     """
+    _data = content.encode("utf-8")
+    # Remove empty line at the end without copying the data.
+    _end = len(_data)
+    while _end and _data[_end - 1] == 10:  # b"\n"
+        _end -= 1
+    # Replace the file a symlink points to, not the symlink itself.
+    _filename = os.path.realpath(filename)
+    # Write to a unique temporary file first, so that the target file is
+    # replaced atomically and never left half-written.
+    _tmp_filename = "%s.%s.tmp" % (_filename, uuid.uuid4().hex)
+    # Let the OS apply the umask to the mode of a new file.
+    _fd = os.open(_tmp_filename,
+                  os.O_WRONLY | os.O_CREAT | os.O_EXCL
+                  | getattr(os, "O_BINARY", 0),
+                  0o666)
     try:
-        with open(filename, "w") as opened_file:
-            _content = content.rstrip("\n")  # Remove empty line at the end.
-            _content = opened_file.write(_content)
-        return True
-    except Exception as ex:
-        if LOG:
-            print("Failed to write file %s. Exception: %s" % (
-                filename, str(ex)))
-        raise  # Re-throw catched exception.
+        with open(_fd, "wb") as opened_file:
+            opened_file.write(memoryview(_data)[:_end])
+        # Keep the mode of an existing file.
+        try:
+            _mode = stat.S_IMODE(os.stat(_filename).st_mode)
+        except FileNotFoundError:
+            pass
+        else:
+            os.chmod(_tmp_filename, _mode)
+        os.replace(_tmp_filename, _filename)
+    except BaseException:
+        try:
+            os.unlink(_tmp_filename)
+        except OSError:
+            pass
+        raise
+    return True
+
+
+def _read_bytes(filename: str) -> bytes:
+    # Read the whole file with a single read call of the file size, which
+    # avoids the buffering of file objects. Keep reading in chunks until
+    # EOF, as the size might be 0 or outdated (e.g. for pipes or procfs).
+    _fd = os.open(filename, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        _size = os.fstat(_fd).st_size
+        _chunks = [os.read(_fd, _size)] if _size else []
+        while True:
+            _chunk = os.read(_fd, 65536)
+            if not _chunk:
+                break
+            _chunks.append(_chunk)
+        return b"".join(_chunks)
+    finally:
+        os.close(_fd)
 
 
 def read_file(filename: str) -> str:
@@ -61,10 +114,9 @@ def read_file(filename: str) -> str:
         ValueError
     """
     try:
-        with open(filename, "r") as opened_file:
-            _content = opened_file.read()
-            _content = _content.rstrip("\n")  # Remove empty line at the end.
-        return _content
+        _content = _read_bytes(filename)
+        # Remove empty line at the end and decode only once.
+        return _content.rstrip(b"\r\n").decode("utf-8")
     except Exception as ex:
         if LOG:
             print("Failed to read file %s. Exception: %s" % (
@@ -90,7 +142,7 @@ def read_base64_content(filename: str) -> str:
         binascii.Error
     """
     try:
-        _content_b64 = read_file(filename)
+        _content_b64 = _read_bytes(filename)
         _content = base64.b64decode(_content_b64).decode("utf-8")
         _content = _content.rstrip("\n")  # Remove empty line at the end.
         return _content
@@ -101,6 +153,35 @@ def read_base64_content(filename: str) -> str:
         raise  # Re-throw catched exception.
 
 
+def iter_csv(path: str,
+             newline: str = "",
+             delimiter: str = ",",
+             quotechar: str = None):
+    """
+    Iterate over the rows of a CSV file without reading the whole file.
+
+    Args:
+        path: The path to the file you want to read.
+        newline: The newline character, default is ''.
+        delimiter: The CSV content delimiter, default is ','.
+        quotechar: A char used to quote fields containing special characters,
+            default is None (quoting disabled).
+
+    Returns:
+        A generator yielding each CSV row as a list of strings.
+
+    Raises:
+        OSError: The file could not be opened.
+        csv.Error: The CSV content could not be parsed.
+    """
+    if quotechar is None:
+        _quoting = {"quoting": csv.QUOTE_NONE}
+    else:
+        _quoting = {"quotechar": quotechar}
+    with open(path, newline=newline) as csvfile:
+        yield from csv.reader(csvfile, delimiter=delimiter, **_quoting)
+
+
 def read_csv(path: str,
              newline: str = "",
              delimiter: str = ",",
@@ -108,23 +189,23 @@ def read_csv(path: str,
     """
     Read a CSV file.
 
+    Use `iter_csv` instead if the rows are only iterated once.
+
     Args:
         path: The path to the file you want to read.
         newline: The newline character, default is ''.
         delimiter: The CSV content delimiter, default is ','.
         quotechar: A char used to quote fields containing special characters,
-            default is None.
+            default is None (quoting disabled).
 
     Returns:
         A list containing each CSV row as a list of strings.
 
     Raises:
+        OSError: The file could not be opened.
+        csv.Error: The CSV content could not be parsed.
     """
-    items = []
-    with open(path, newline=newline) as csvfile:
-        csv_reader = csv.reader(csvfile,
-                                delimiter=delimiter,
-                                quotechar=quotechar)
-        for row in csv_reader:
-            items.append(row)
-    return items
+    return list(iter_csv(path,
+                         newline=newline,
+                         delimiter=delimiter,
+                         quotechar=quotechar))
@@ -1,7 +1,7 @@
 #!/usr/bin/env python
 __FILENAME__="powershell.py"
 __AUTHOR__="David Wettstein"
-__VERSION__="1.1.1"
+__VERSION__="1.3.0"
 __COPYRIGHT__="Copyright (c) 2018-2021 %s" % (__AUTHOR__)
 __LICENSE__="MIT License (https://dwettstein.mit-license.org/)"
 __LINK__="https://github.com/dwettstein/PythonStuff"
@@ -10,13 +10,24 @@ __DESCRIPTION__=(
     "or code."
 )
 # Changelog:
+# - v1.3.0, 2026-10-15, David Wettstein: Quote inputs, add Expression.
+# - v1.2.0, 2026-10-15, David Wettstein: Add PowerShellHost, execute_scripts.
 # - v1.1.1, 2021-12-19, David Wettstein: Refactor header part.
 # - v1.1.0, 2021-04-20, David Wettstein: Add cross-platform bin.
 # - v1.0.1, 2020-11-29, David Wettstein: Use -Command not -File.
 # - v1.0.0, 2018-11-26, David Wettstein: Initial module.
 
 
+import base64
+from concurrent.futures import ThreadPoolExecutor
+import os
 import platform
+import queue
+import re
+import subprocess
+import threading
+import time
+import uuid
 
 from . import childprocess
 
@@ -24,6 +35,9 @@ from . import childprocess
 LOG = True
 DEBUG = False
 
+# Avoid interleaved log output of scripts executed in parallel.
+_PRINT_LOCK = threading.Lock()
+
 
 POWERSHELL_PATHS = {
     "Windows": "C:\\WINDOWS\\system32\\WindowsPowerShell\\v1.0\\powershell.exe",
@@ -31,11 +45,178 @@ POWERSHELL_PATHS = {
     "Darwin": "/usr/local/bin/pwsh",  # MacOS
 }
 
+# The platform doesn't change at runtime, so look up the defaults only once.
+_SYSTEM = platform.system()
+_DEFAULT_POWERSHELL_PATH = POWERSHELL_PATHS.get(_SYSTEM)
+_DEFAULT_EXECUTION_POLICY = "RemoteSigned" if _SYSTEM == "Windows" else None
+
+# Script inputs consisting only of these chars are passed without quotes.
+_SAFE_INPUT = re.compile(r"[A-Za-z0-9_./:-]+")
+# PowerShell treats typographic single quotes like the ASCII one.
+_SINGLE_QUOTES = re.compile("(['\u2018\u2019\u201a\u201b])")
+
+
+class Expression(str):
+    """
+    A script input, which is passed to PowerShell as is and thus evaluated,
+    e.g. `Expression("$true")` or `Expression("-Force:$false")`.
+
+    Only use it with trusted values, as it may contain any PowerShell code.
+    """
+
+
+class PowerShellHost(object):
+    """
+    A long-lived PowerShell process executing scripts one after another.
+
+    Starting PowerShell takes a lot longer than most scripts run, so use a
+    host to execute many scripts with a single PowerShell process. The host
+    can be used as a context manager, which closes the process at the end.
+
+    Args:
+        powershell_exe_path: The path to the PowerShell exe, default is None
+            (see `execute_script`).
+        execution_policy: The execution policy for PowerShell, default is None
+            (see `execute_script`).
+        timeout: The max. number of seconds to wait for a script, default is
+            None (wait forever). If a script takes longer, the host process
+            is killed, as its output could not be assigned anymore.
+    """
+
+    def __init__(self,
+                 powershell_exe_path: str = None,
+                 execution_policy: str = None,
+                 timeout: float = None):
+        _process_args = _powershell_args(powershell_exe_path, execution_policy)
+        # Read the commands to execute from stdin.
+        _process_args.append("-Command")
+        _process_args.append("-")
+        # Marks the end of the output and error of a script.
+        self._sentinel = "###EOF###%s" % uuid.uuid4().hex
+        self._timeout = timeout
+        self._lock = threading.Lock()
+        self._process = subprocess.Popen(
+            _process_args,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            bufsize=1,
+        )
+        # Read both pipes in the background, so that a script filling up
+        # one of them can't block the process.
+        self._stdout = self._start_reader(self._process.stdout)
+        self._stderr = self._start_reader(self._process.stderr)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @staticmethod
+    def _start_reader(stream) -> queue.Queue:
+        _lines = queue.Queue()
+
+        def _read():
+            for _line in iter(stream.readline, ""):
+                _lines.put(_line)
+            _lines.put(None)  # The process has ended.
+
+        threading.Thread(target=_read, daemon=True).start()
+        return _lines
+
+    def _read_until_sentinel(self, lines: queue.Queue, deadline) -> tuple:
+        _result = []
+        while True:
+            try:
+                if deadline is None:
+                    _line = lines.get()
+                else:
+                    _line = lines.get(
+                        timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                self._process.kill()
+                raise TimeoutError("The script didn't end within %s seconds, "
+                                   "killed the PowerShell host process."
+                                   % self._timeout)
+            if _line is None:
+                raise ChildProcessError("The PowerShell host process has ended.")
+            _index = _line.find(self._sentinel)
+            if _index != -1:
+                # Keep a last output without a trailing newline.
+                _result.append(_line[:_index])
+                return ("".join(_result), _line[_index + len(self._sentinel):])
+            _result.append(_line)
+
+    def execute(self, script_path: str, script_inputs: list = None) -> tuple:
+        """
+        Execute a PowerShell script within the host process.
+
+        The script is invoked with the call operator, so that variables of
+        one script don't leak into the next one.
+
+        Args:
+            script_path: A string with the full path to a script.
+            script_inputs: A list containing input parameters for the script
+                (be aware of the order), default is None. See
+                `execute_script` for how they are passed.
+
+        Returns:
+            A tuple containing the script output, error and return code.
+            If no output or error is available, empty strings will be sent.
+
+            (_out, _err, _ret)
+
+        Raises:
+            ChildProcessError: The host process has ended unexpectedly.
+            TimeoutError: The script didn't end within the timeout.
+        """
+        _script = "& %s" % _quote_ps(script_path)
+        if script_inputs:
+            _script += " " + " ".join(_quote_inputs(script_inputs))
+        # The host executes a command per line, so send the script encoded,
+        # as a line break within it would make PowerShell wait for more.
+        _script = base64.b64encode(_script.encode("utf-8")).decode("ascii")
+        _command = (
+            "$global:LASTEXITCODE = 0; "
+            "try { Invoke-Expression ([Text.Encoding]::UTF8.GetString("
+            "[Convert]::FromBase64String('%s'))); $__ret = $LASTEXITCODE } "
+            "catch { $host.UI.WriteErrorLine(($_ | Out-String)); $__ret = 1 }; "
+            "Write-Output ('%s' + $__ret); "
+            "$host.UI.WriteErrorLine('%s')\n"
+        ) % (_script, self._sentinel, self._sentinel)
+        with self._lock:
+            if self._timeout is None:
+                _deadline = None
+            else:
+                _deadline = time.monotonic() + self._timeout
+            self._process.stdin.write(_command)
+            self._process.stdin.flush()
+            (_out, _ret) = self._read_until_sentinel(self._stdout, _deadline)
+            (_err, _) = self._read_until_sentinel(self._stderr, _deadline)
+        try:
+            _ret = int(_ret)
+        except ValueError:
+            _ret = 1
+        return (_out, _err, _ret)
+
+    def close(self):
+        """Close the host process."""
+        if self._process.poll() is None:
+            try:
+                self._process.stdin.close()
+                self._process.wait(timeout=10)
+            except (OSError, subprocess.TimeoutExpired):
+                self._process.kill()
+                self._process.wait()
+
 
 def execute_script(script_path: str,
                    script_inputs: list = None,
                    powershell_exe_path: str = None,
-                   execution_policy: str = None) -> tuple:
+                   execution_policy: str = None,
+                   host: PowerShellHost = None) -> tuple:
     """
     Execute a PowerShell script.
 
@@ -45,7 +226,11 @@ def execute_script(script_path: str,
     Args:
         script_path: A string with the full path to a script.
         script_inputs: A list containing input parameters for the script
-            (be aware of the order), default is None.
+            (be aware of the order), default is None. Each input is passed
+            as a literal string, e.g. `$true`, `a,b` or `-Force:$false` are
+            not evaluated. Only inputs consisting of letters, digits and
+            `_./:-` are passed as is (e.g. to allow `-Switch`). Wrap inputs
+            meant to be evaluated in an `Expression`.
         powershell_exe_path: The path to the PowerShell exe, default is None.
             For Windows, default is
             "C:\\WINDOWS\\system32\\WindowsPowerShell\\v1.0\\powershell.exe".
@@ -54,6 +239,9 @@ def execute_script(script_path: str,
             For Windows, default is "RemoteSigned".
             See also:
             https://docs.microsoft.com/en-us/powershell/module/microsoft.powershell.core/about/about_execution_policies
+        host: A `PowerShellHost` to execute the script in, default is None.
+            If None, a new PowerShell process is started for the script and
+            the args `powershell_exe_path` and `execution_policy` are used.
 
     Returns:
         A tuple containing the script output, error and return code.
@@ -65,54 +253,40 @@ def execute_script(script_path: str,
     """
     if LOG:
         if DEBUG:
-            print("Executing %s with inputs %s" % (
-                script_path, str(script_inputs)))
+            _log("Executing %s with inputs %s", script_path, script_inputs)
         else:
-            print("Executing %s" % (script_path))
+            _log("Executing %s", script_path)
 
-    # Set default values if not provided as args.
-    if powershell_exe_path is None:
-        powershell_exe_path = POWERSHELL_PATHS.get(platform.system())
-        assert powershell_exe_path, (
-            "Unknown platform, please provide the path to PowerShell as argument."
-        )
-    if execution_policy is None and platform.system() == "Windows":
-        execution_policy = "RemoteSigned"
+    if host is None:
+        # Prepare arguments for subprocess.
+        _process_args = _powershell_args(powershell_exe_path, execution_policy)
 
-    # Prepare arguments for subprocess.
-    _process_args = [
-        powershell_exe_path,
-        "-NoLogo",
-        "-NoProfile",
-        "-NonInteractive",
-    ]
-    if execution_policy is not None:
-        _process_args.extend(["-ExecutionPolicy", execution_policy])
+        # Use -Command as -File doesn't work properly with begin, process, end blocks.
+        _process_args.append("-Command")
+        _process_args.append(script_path)
 
-    # Use -Command as -File doesn't work properly with begin, process, end blocks.
-    _process_args.extend(["-Command", script_path])
-
-    if script_inputs:
         # Add script inputs if any.
-        # Surround with quotes if the input contains spaces and escape quotes within it.
-        _process_args.extend(
-            ["\"%s\"" % str(i).replace('"', '`"') if " " in i else i for i in script_inputs]
-        )
+        _process_args.extend(_quote_inputs(script_inputs))
 
-    # Preserve a possible script specific exit code.
-    _process_args.extend(["; exit $LASTEXITCODE"])
+        # Preserve a possible script specific exit code.
+        _process_args.append("; exit $LASTEXITCODE")
+    else:
+        _process_args = [script_path] + list(script_inputs or [])
 
     try:
         if LOG and DEBUG:
-            print(_process_args)
-        (_out, _err, _ret) = childprocess.execute(_process_args)
+            _log("%s", _process_args)
+        if host is None:
+            (_out, _err, _ret) = childprocess.execute(_process_args)
+        else:
+            (_out, _err, _ret) = host.execute(script_path, script_inputs)
         _out = _out.rstrip("\n")  # Remove empty line at the end.
         _err = _err.rstrip("\n")  # Remove empty line at the end.
     except Exception as ex:
         err_msg = ("Failed to execute PowerShell script with "
                    "args %s. Exception: %s" % (_process_args, str(ex)))
         if LOG:
-            print(err_msg)
+            _log(err_msg)
         _out = ""
         _err = err_msg
 
@@ -120,6 +294,77 @@ def execute_script(script_path: str,
         _ret = 1
 
     if LOG and DEBUG:
-        print("Script %s ended with exit code %s and result %s" % (
-            script_path, _ret, (_err if _err else _out)))
+        _log("Script %s ended with exit code %s and result %s",
+             script_path, _ret, (_err if _err else _out))
     return (_out, _err, _ret)
+
+
+def execute_scripts(jobs: list, max_workers: int = None) -> list:
+    """
+    Execute multiple PowerShell scripts in parallel.
+
+    Similar to `ForEach-Object -Parallel -ThrottleLimit` in PowerShell, the
+    scripts are executed by a pool of threads, each waiting on its own
+    PowerShell process.
+
+    Args:
+        jobs: A list of dicts, each containing the args for `execute_script`
+            (e.g. `{"script_path": "C:\\script.ps1", "script_inputs": []}`).
+        max_workers: The max. number of scripts executed at the same time
+            (i.e. the throttle limit), default is twice the number of CPUs.
+
+    Returns:
+        A list with a tuple `(_out, _err, _ret)` for each job, in the same
+        order as the given jobs.
+
+    Raises:
+    """
+    if max_workers is None:
+        max_workers = (os.cpu_count() or 1) * 2
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(lambda job: execute_script(**job), jobs))
+
+
+def _log(msg: str, *args):
+    # Format the message only when it's actually printed.
+    with _PRINT_LOCK:
+        print(msg % args if args else msg)
+
+
+def _powershell_args(powershell_exe_path: str = None,
+                     execution_policy: str = None) -> list:
+    # Set default values if not provided as args.
+    if powershell_exe_path is None:
+        powershell_exe_path = _DEFAULT_POWERSHELL_PATH
+        assert powershell_exe_path, (
+            "Unknown platform, please provide the path to PowerShell as argument."
+        )
+    if execution_policy is None:
+        execution_policy = _DEFAULT_EXECUTION_POLICY
+
+    _process_args = [
+        powershell_exe_path,
+        "-NoLogo",
+        "-NoProfile",
+        "-NonInteractive",
+    ]
+    if execution_policy is not None:
+        _process_args.append("-ExecutionPolicy")
+        _process_args.append(execution_policy)
+    return _process_args
+
+
+def _quote_inputs(script_inputs: list):
+    # A generator, so that no intermediate list is built.
+    return (i if isinstance(i, Expression) else _quote_ps(str(i))
+            for i in script_inputs or ())
+
+
+def _quote_ps(value: str) -> str:
+    # Return the input as is, if it can't contain any PowerShell syntax
+    # (e.g. to still allow `-Switch`).
+    if _SAFE_INPUT.fullmatch(value):
+        return value
+    # Else surround with single quotes, within which PowerShell expands
+    # nothing, and double the single quotes within it.
+    return "'%s'" % _SINGLE_QUOTES.sub(r"\1\1", value)
@@ -1,7 +1,7 @@
 #!/usr/bin/env python
 __FILENAME__="webrequest.py"
 __AUTHOR__="David Wettstein"
-__VERSION__="2.0.4"
+__VERSION__="2.1.0"
 __COPYRIGHT__="Copyright (c) 2018-2021 %s" % (__AUTHOR__)
 __LICENSE__="MIT License (https://dwettstein.mit-license.org/)"
 __LINK__="https://github.com/dwettstein/PythonStuff"
@@ -10,6 +10,7 @@ __DESCRIPTION__=(
     "handling."
 )
 # Changelog:
+# - v2.1.0, 2026-10-15, David Wettstein: Use a session with retries by default.
 # - v2.0.4, 2021-12-19, David Wettstein: Refactor header part and fix typos.
 # - v2.0.3, 2020-11-29, David Wettstein: Improve linting.
 # - v2.0.2, 2020-04-27, David Wettstein: Add attr _fqdn.
@@ -18,13 +19,80 @@ __DESCRIPTION__=(
 # - v1.0.0, 2018-11-24, David Wettstein: Initial module.
 
 
+import codecs
+import json
 import logging
 import re
+from typing import Union
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
 from requests.auth import HTTPDigestAuth
 from requests.exceptions import RequestException
+from urllib3.util.retry import Retry
+
+try:
+    # Use the faster orjson package to decode responses if available.
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
+
+
+# The default (connect, read) timeout in seconds for requests.
+DEFAULT_TIMEOUT = (5.0, 30.0)
+
+_WARNINGS_DISABLED = False
+
+# orjson decodes integers exceeding 64 bits as floats, so leave numbers with
+# that many digits to the json module.
+_LONG_NUMBER = re.compile(rb"[0-9]{19}")
+
+_LOG_FORMATTER = logging.Formatter("%(asctime)s | "
+                                   "%(levelname)s | "
+                                   "%(name)s | "
+                                   "%(module)s | "
+                                   "%(funcName)s | "
+                                   "%(message)s")
+
+
+def _json_loads(content: bytes):
+    # Decode like `response.json()`, but with orjson where it's equivalent.
+    if _orjson is not None and not _LONG_NUMBER.search(content):
+        try:
+            return _orjson.loads(content)
+        except _orjson.JSONDecodeError:
+            pass  # E.g. NaN, which the json module accepts.
+    return json.loads(content)
+
+
+def _decode_json(response):
+    # Decode the bytes directly, without response.text, if they are UTF-8
+    # (or their encoding is unknown, as the json module detects it then).
+    _encoding = response.encoding
+    if _encoding is not None:
+        try:
+            _encoding = codecs.lookup(_encoding).name
+        except LookupError:
+            pass
+        if _encoding != "utf-8":
+            return json.loads(response.text)
+    return _json_loads(response.content)
+
+
+def _split_base_url(base_url: str) -> tuple:
+    # Return the base URL with protocol and without trailing slash, and the
+    # FQDN without protocol and a possible www. prefix.
+    if base_url[-1] == "/":
+        base_url = base_url[:-1]
+    if base_url.startswith(("https://", "http://")):
+        fqdn = base_url[base_url.index("//") + 2:]
+        if fqdn.startswith("www."):
+            fqdn = fqdn[4:]
+    else:
+        fqdn = base_url
+        base_url = "https://" + base_url
+    return (base_url, fqdn)
 
 
 class WebRequester(object):
@@ -34,7 +102,8 @@ class WebRequester(object):
 
     Args:
         base_url: str: The base URL of the web API.
-        use_session: bool: If true, a requests session will be used.
+        use_session: bool: If true (default), a requests session will be
+            used, which reuses connections to the API (keep-alive).
         verify_ssl_certs: bool: If true, validate server certificates.
             Set to false to allow self-signed certificates.
         disable_warnings: bool: If true, disables all warning messages from
@@ -45,6 +114,10 @@ class WebRequester(object):
         log_headers: bool: If true, all headers will be logged (pay attention
             with passwords).
         log_bodies: bool: If true, all bodies will be logged.
+        pool_maxsize: int: The max. number of connections kept open per host
+            when using a session, default is 50.
+        log_body_limit: int: If set, logged response bodies are truncated to
+            this number of bytes, default is None (no limit).
 
     Returns:
         The WebRequester instance for the given URL.
@@ -52,21 +125,18 @@ class WebRequester(object):
 
     def __init__(self,
                  base_url: str,
-                 use_session: bool = False,
+                 use_session: bool = True,
                  verify_ssl_certs: bool = True,
                  disable_warnings: bool = False,
                  log_file: str = None,
                  log_print: bool = False,
                  log_requests: bool = False,
                  log_headers: bool = False,
-                 log_bodies: bool = False):
-        if base_url[-1] == "/":
-            self._base_url = base_url[:-1]
-        else:
-            self._base_url = base_url
-        self._fqdn = re.sub(r"^http(s)?://(www\.)?", "", self._base_url)
-        if not re.search(r"^http(s)?://", self._base_url):
-            self._base_url = "https://" + self._base_url
+                 log_bodies: bool = False,
+                 pool_maxsize: int = 50,
+                 log_body_limit: int = None):
+        (self._base_url, self._fqdn) = _split_base_url(base_url)
+        self._base_url_slash = self._base_url + "/"
         self._username = None
         self._password = None
         self._auth = None
@@ -79,21 +149,38 @@ class WebRequester(object):
         if self._use_session:
             self._session = requests.Session()
             self._session.verify = self._verify_ssl_certs
+            # Retry idempotent requests on connection errors and temporary
+            # server errors, but return the last response if they persist.
+            # Ignore Retry-After, as it could block for hours.
+            adapter = HTTPAdapter(pool_connections=10,
+                                  pool_maxsize=pool_maxsize,
+                                  max_retries=Retry(
+                                      total=3,
+                                      backoff_factor=0.2,
+                                      status_forcelist=(502, 503, 504),
+                                      respect_retry_after_header=False,
+                                      raise_on_status=False))
+            self._session.mount("http://", adapter)
+            self._session.mount("https://", adapter)
         else:
             self._session = None
 
-        if self._disable_warnings:
+        global _WARNINGS_DISABLED
+        if self._disable_warnings and not _WARNINGS_DISABLED:
             # from urllib3.exceptions import InsecureRequestWarning
             # requests.packages.urllib3.disable_warnings(
             #     category=InsecureRequestWarning)
             # pylint: disable=E1101
             requests.packages.urllib3.disable_warnings()
+            # The warning filter is process-wide, so add it only once.
+            _WARNINGS_DISABLED = True
 
         self._logger = Logger(log_file=log_file,
                               log_print=log_print,
                               log_requests=log_requests,
                               log_headers=log_headers,
-                              log_bodies=log_bodies)
+                              log_bodies=log_bodies,
+                              log_body_limit=log_body_limit)
 
     def set_default_headers(self,
                             headers: dict):
@@ -155,8 +242,9 @@ class WebRequester(object):
                endpoint: str,
                headers: dict = None,
                params: dict = None,
-               data: str = None,
-               json=None) -> requests.Response:
+               data: Union[str, bytes] = None,
+               json=None,
+               timeout=DEFAULT_TIMEOUT) -> requests.Response:
         """
         Invoke an endpoint of the web API with given HTTP method.
 
@@ -167,10 +255,14 @@ class WebRequester(object):
                 (e.g. `{"Accept": "application/json"}`), default is `None`.
             params: dict: A dict of URL query string data
                 (e.g. `{"key": "value"}`), default is `None`.
-            data: str: The request body as string, use either data or json,
-                default is `None`.
+            data: str/bytes: The request body as string or bytes, use either
+                data or json, default is `None`. Pass already encoded bytes
+                (e.g. a cached body) to avoid encoding it on every request.
             json: object: The request body as object, use either data or json,
                 default is `None`.
+            timeout: float/tuple: The timeout in seconds, either as a float or
+                as a tuple `(connect timeout, read timeout)`, default is
+                `DEFAULT_TIMEOUT`. Use `None` to wait forever.
 
         Returns:
             The response of the request as `requests.Response` object.
@@ -180,28 +272,41 @@ class WebRequester(object):
                 An ambiguous exception raised by requests package.
         """
 
-        if endpoint.startswith("/"):
-            url = self._base_url + endpoint
-        else:
-            url = self._base_url + "/" + endpoint
+        url = self._base_url_slash + endpoint.lstrip("/")
 
-        request_headers = self._headers.copy() if self._headers else {}
-        if headers:
-            request_headers.update(headers)
+        if self._session:
+            # The session merges its default headers (see
+            # `set_default_headers`) with the additional ones by itself.
+            request_headers = headers
+            if self._logger.logs_headers:
+                log_headers = {**self._session.headers, **(headers or {})}
+            else:
+                log_headers = None
+        else:
+            # The merged headers are only read, so a copy of the default
+            # headers is only needed if there are additional ones.
+            if headers:
+                request_headers = ({**self._headers, **headers}
+                                   if self._headers else headers)
+            else:
+                # None if neither default nor additional headers are set.
+                request_headers = self._headers if self._headers else None
+            log_headers = request_headers
 
         self._logger.log_request(url=url,
                                  method=method,
-                                 headers=request_headers,
+                                 headers=log_headers,
                                  body=(data if data else json))
 
         if self._session:
             response = self._session.request(
                 method=method,
                 url=url,
-                headers=headers,
+                headers=request_headers,
                 params=params,
                 data=data,
-                json=json)
+                json=json,
+                timeout=timeout)
         else:
             response = requests.request(
                 method=method,
@@ -209,7 +314,8 @@ class WebRequester(object):
                 headers=request_headers,
                 params=params,
                 data=data,
-                json=json)
+                json=json,
+                timeout=timeout)
 
         self._logger.log_response(response=response)
 
@@ -220,10 +326,11 @@ class WebRequester(object):
                           endpoint: str,
                           headers: dict = None,
                           params: dict = None,
-                          data: str = None,
+                          data: Union[str, bytes] = None,
                           json=None,
                           decode_response: bool = True,
-                          as_tuple: bool = False):
+                          as_tuple: bool = False,
+                          timeout=DEFAULT_TIMEOUT):
         """
         Invoke an endpoint of the web API with given HTTP method and handle
         the response.
@@ -235,8 +342,9 @@ class WebRequester(object):
                 (e.g. `{"Accept": "application/json"}`), default is `None`.
             params: dict: A dict of URL query string data
                 (e.g. `{"key": "value"}`), default is `None`.
-            data: str: The request body as string, use either data or json,
-                default is `None`.
+            data: str/bytes: The request body as string or bytes, use either
+                data or json, default is `None`. Pass already encoded bytes
+                (e.g. a cached body) to avoid encoding it on every request.
             json: object: The request body as JSON, use either data or json,
                 default is `None`.
             decode_response: bool: If true, decodes the response content,
@@ -245,6 +353,9 @@ class WebRequester(object):
             as_tuple: bool: If true, returns the response as a tuple in
                 the following format: `(status_code, headers, data)`,
                 default is `False`.
+            timeout: float/tuple: The timeout in seconds, either as a float or
+                as a tuple `(connect timeout, read timeout)`, default is
+                `DEFAULT_TIMEOUT`. Use `None` to wait forever.
 
         Returns:
             The response content as an object or if not possible as text.
@@ -265,13 +376,14 @@ class WebRequester(object):
                                headers=headers,
                                params=params,
                                data=data,
-                               json=json)
+                               json=json,
+                               timeout=timeout)
         if response.ok:
             response_data = ""
             if response.status_code != 204:
                 if decode_response:
                     try:
-                        response_data = response.json()
+                        response_data = _decode_json(response)
                     except Exception:
                         response_data = response.text
                 else:
@@ -294,6 +406,8 @@ class Logger(object):
         log_headers: bool: If true, all headers will be logged (pay attention
             with passwords).
         log_bodies: bool: If true, all bodies will be logged.
+        log_body_limit: int: If set, logged response bodies are truncated to
+            this number of bytes, default is None (no limit).
     """
 
     def __init__(self,
@@ -301,12 +415,14 @@ class Logger(object):
                  log_print: bool = False,
                  log_requests: bool = False,
                  log_headers: bool = False,
-                 log_bodies: bool = False):
+                 log_bodies: bool = False,
+                 log_body_limit: int = None):
         self._log_file = log_file
         self._log_print = log_print
         self._log_requests = log_requests
         self._log_headers = log_headers
         self._log_bodies = log_bodies
+        self._log_body_limit = log_body_limit
 
         self._logger = logging.getLogger(__name__)
         self._logger.setLevel(logging.DEBUG)
@@ -317,15 +433,14 @@ class Logger(object):
                 handler = logging.FileHandler(log_file)
             else:
                 handler = logging.NullHandler()
-            formatter = logging.Formatter("%(asctime)s | "
-                                          "%(levelname)s | "
-                                          "%(name)s | "
-                                          "%(module)s | "
-                                          "%(funcName)s | "
-                                          "%(message)s")
-            handler.setFormatter(formatter)
+            handler.setFormatter(_LOG_FORMATTER)
             self._logger.addHandler(handler)
 
+    @property
+    def logs_headers(self) -> bool:
+        """True if request and response headers are logged."""
+        return self._log_requests and self._log_headers
+
     def log_request(self,
                     url: str,
                     method: str,
@@ -334,15 +449,15 @@ class Logger(object):
         if not self._log_requests:
             return
 
-        self._log("Invoking %s %s" % (method, url))
+        self._log("Invoking %s %s", method, url)
 
         if self._log_headers:
-            self._log("Request headers: %s" % (str(headers)))
+            self._log("Request headers: %s", headers)
 
         if self._log_bodies and body:
             if isinstance(body, bytes):
                 body = body.decode(errors="ignore")
-            self._log("Request body: %s" % (str(body)))
+            self._log("Request body: %s", body)
 
     def log_response(self,
                      response: requests.Response,
@@ -350,18 +465,28 @@ class Logger(object):
         if not self._log_requests:
             return
 
-        self._log("Response status code: %s" % (response.status_code))
+        self._log("Response status code: %s", response.status_code)
 
         if self._log_headers:
-            self._log("Response headers: %s" % (response.headers))
+            self._log("Response headers: %s", response.headers)
 
-        if self._log_bodies and not skip_body and response.text:
-            self._log("Response body: %s" % (response.text))
-
-    def _log(self, msg: str):
+        if not self._log_bodies or skip_body:
+            return
+        if self._log_body_limit is None:
+            body = response.text
+        else:
+            # Decode only the logged part instead of the whole content.
+            body = response.content[:self._log_body_limit].decode(
+                errors="ignore")
+        if body:
+            self._log("Response body: %s", body)
+
+    def _log(self, msg: str, *args):
+        # Pass the args on to the logger, which formats the message only if
+        # a handler actually emits it.
         if self._log_print:
-            print(msg)
-        self._logger.debug(msg)
+            print(msg % args if args else msg)
+        self._logger.debug(msg, *args)
 
 
 def status_code_to_exception(status_code, *args, **kwargs):
@@ -375,31 +500,9 @@ def status_code_to_exception(status_code, *args, **kwargs):
         webrequest.WebRequestResponseException:
             An ambiguous exception depending on the response status code.
     """
-    if status_code == 400:
-        raise BadRequestException(status_code, *args, **kwargs)
-    if status_code == 401:
-        raise UnauthorizedException(status_code, *args, **kwargs)
-    if status_code == 403:
-        raise AccessForbiddenException(status_code, *args, **kwargs)
-    if status_code == 404:
-        raise NotFoundException(status_code, *args, **kwargs)
-    if status_code == 405:
-        raise MethodNotAllowedException(status_code, *args, **kwargs)
-    if status_code == 406:
-        raise NotAcceptableException(status_code, *args, **kwargs)
-    if status_code == 408:
-        raise RequestTimeoutException(status_code, *args, **kwargs)
-    if status_code == 409:
-        raise ConflictException(status_code, *args, **kwargs)
-    if status_code == 415:
-        raise UnsupportedMediaTypeException(status_code, *args, **kwargs)
-    if status_code == 416:
-        raise InvalidContentLengthException(status_code, *args, **kwargs)
-    if status_code == 500:
-        raise InternalServerException(status_code, *args, **kwargs)
-    if status_code == 503:
-        raise ServiceUnavailableException(status_code, *args, **kwargs)
-    raise WebRequestResponseException(status_code, *args, **kwargs)
+    exception_class = STATUS_CODE_EXCEPTIONS.get(status_code,
+                                                 WebRequestResponseException)
+    raise exception_class(status_code, *args, **kwargs)
 
 
 class WebRequestException(RequestException):
@@ -472,3 +575,21 @@ class InternalServerException(WebRequestResponseException):
 
 class ServiceUnavailableException(WebRequestResponseException):
     """Raised when response status code was 503."""
+
+
+# Exception classes by HTTP status code, used by `status_code_to_exception`.
+# Add further classes here to raise them for other status codes.
+STATUS_CODE_EXCEPTIONS = {
+    400: BadRequestException,
+    401: UnauthorizedException,
+    403: AccessForbiddenException,
+    404: NotFoundException,
+    405: MethodNotAllowedException,
+    406: NotAcceptableException,
+    408: RequestTimeoutException,
+    409: ConflictException,
+    415: UnsupportedMediaTypeException,
+    416: InvalidContentLengthException,
+    500: InternalServerException,
+    503: ServiceUnavailableException,
+}